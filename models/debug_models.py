@@ -4,14 +4,27 @@ Debug Script for Autoencoder and Evaluator Modules.
 This script is designed to:
 1. Test the autoencoder functionality (train, save, load, evaluate).
 2. Test evaluator functions (metrics and anomaly detection).
-3. Use sample data from `sample_data.json` for debugging.
+3. Compare the shared-encoder setup against one model per owner.
+4. Compare quantized (float16/int8) models against the float32 model.
+5. Use sample data from `sample_data.json` for debugging.
 
 Run this script to ensure `autoencoder.py` and `evaluator.py` work as intended.
 """
 
 import json
+import os
+import tempfile
+import time
 import numpy as np
-from autoencoder import train_autoencoder, load_autoencoder, evaluate_anomaly
+from tensorflow.python.keras.models import load_model
+from autoencoder import (
+    train_autoencoder, load_autoencoder, evaluate_anomaly, build_autoencoder,
+    calculate_reconstruction_error as autoencoder_reconstruction_error, MODEL_PATH
+)
+from quantized_autoencoder import export_quantized_model, load_quantized_model
+from shared_autoencoder import (
+    train_shared_encoder, load_shared_encoder, train_user_head, SharedEncoderScorer
+)
 from evaluator import calculate_cosine_similarity, calculate_reconstruction_error
 
 
@@ -75,6 +88,176 @@ def debug_evaluator(owner_data, test_data):
     reconstruction_err = calculate_reconstruction_error(owner_data.mean(axis=0), test_data.mean(axis=0))
     print(f"Reconstruction Error: {reconstruction_err}")
 
+
+def _process_memory():
+    """
+    Read the resident (RSS) and proportional (PSS) memory of this process.
+
+    PSS splits shared pages between the processes mapping them. Only available
+    where `/proc` exists (Linux); elsewhere memory is reported as unavailable.
+
+    :return: Tuple (rss, pss) in bytes, or None if unavailable.
+    """
+    fields = {}
+    for path in ("/proc/self/smaps_rollup", "/proc/self/status"):
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                for line in file:
+                    parts = line.split()
+                    if len(parts) >= 2 and parts[1].isdigit():
+                        fields.setdefault(parts[0].rstrip(":"), int(parts[1]) * 1024)
+    if "Rss" in fields:
+        return fields["Rss"], fields.get("Pss", fields["Rss"])
+    if "VmRSS" in fields:
+        return fields["VmRSS"], fields["VmRSS"]
+    return None
+
+
+def _memory_delta(before, after, count=1):
+    """
+    Format the RSS/PSS growth between two `_process_memory` readings.
+
+    :param before: Reading taken before the measured step.
+    :param after: Reading taken after the measured step.
+    :param count: Number of models the growth is divided between.
+    :return: Human-readable RSS/PSS growth in KB.
+    """
+    if before is None or after is None:
+        return "RSS/PSS unavailable"
+    rss = (after[0] - before[0]) / count / 1024
+    pss = (after[1] - before[1]) / count / 1024
+    return f"RSS/PSS +{rss:.1f}/{pss:.1f} KB"
+
+
+# Debug Shared Encoder
+def debug_shared_encoder(owner_data, test_data, n_users=20, n_rounds=10):
+    """
+    Compare the shared encoder with per-owner heads against one model per owner.
+
+    Reports per-owner disk size, process memory (RSS), load time and scoring
+    throughput for both setups, plus the one-time shared encoder load cost.
+    Simulated owners are jittered copies of the owner data, and everything is
+    written to a temporary directory so saved encoders and heads are untouched.
+
+    :param owner_data: Owner's normalized typing data.
+    :param test_data: Test user's normalized typing data.
+    :param n_users: Number of simulated owners.
+    :param n_rounds: Number of times every owner scores the test data.
+    """
+    print("\n=== Shared Encoder Debug ===")
+    rng = np.random.default_rng(0)
+    users = [np.clip(owner_data + rng.normal(0, 0.05, owner_data.shape), 0, 1).astype(np.float32)
+             for _ in range(n_users)]
+    owner_ids = [f"debug_user_{i}" for i in range(n_users)]
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        # One model per owner (weights do not affect size, load time or throughput)
+        paths = []
+        for owner_id in owner_ids:
+            path = os.path.join(model_dir, f"{owner_id}.h5")
+            build_autoencoder(owner_data.shape[1]).save(path)
+            paths.append(path)
+        disk = sum(os.path.getsize(path) for path in paths) / n_users
+
+        memory_before = _process_memory()
+        start = time.perf_counter()
+        models = [load_model(path) for path in paths]
+        load_time = (time.perf_counter() - start) / n_users
+        for model in models:
+            model.predict(test_data)  # Warm up each model outside the timed loop
+        memory = _memory_delta(memory_before, _process_memory(), n_users)
+
+        start = time.perf_counter()
+        for _ in range(n_rounds):
+            for model in models:
+                model.predict(test_data)
+        throughput = n_rounds * n_users * len(test_data) / (time.perf_counter() - start)
+        print(f"Per-owner models: {disk / 1024:.1f} KB on disk, {memory}, "
+              f"{load_time * 1000:.2f} ms load, {throughput:.0f} scores/s")
+
+        # Shared encoder with per-owner heads
+        print("Training the shared encoder and heads...")
+        encoder_path = os.path.join(model_dir, "shared_encoder.h5")
+        heads_dir = os.path.join(model_dir, "user_heads")
+        encoder = train_shared_encoder(np.vstack(users), path=encoder_path)
+        for owner_id, data in zip(owner_ids, users):
+            train_user_head(owner_id, data, encoder, heads_dir=heads_dir)
+        disk = sum(os.path.getsize(os.path.join(heads_dir, f"{owner_id}.npz"))
+                   for owner_id in owner_ids) / n_users
+
+        memory_before = _process_memory()
+        start = time.perf_counter()
+        encoder = load_shared_encoder(encoder_path)
+        encoder_load_time = time.perf_counter() - start
+        encoder.predict(test_data)  # Warm up the encoder outside the timed loop
+        memory = _memory_delta(memory_before, _process_memory())
+        print(f"Shared encoder (once): {os.path.getsize(encoder_path) / 1024:.1f} KB on disk, "
+              f"{memory}, {encoder_load_time * 1000:.2f} ms load")
+
+        memory_before = _process_memory()
+        start = time.perf_counter()
+        scorer = SharedEncoderScorer(encoder, owner_ids, heads_dir=heads_dir)
+        load_time = (time.perf_counter() - start) / n_users
+        memory = _memory_delta(memory_before, _process_memory(), n_users)
+
+        start = time.perf_counter()
+        for _ in range(n_rounds):
+            errors = scorer.reconstruction_error(test_data)
+        throughput = n_rounds * n_users * len(test_data) / (time.perf_counter() - start)
+        print(f"Per-owner heads: {disk / 1024:.1f} KB on disk, {memory}, "
+              f"{load_time * 1000:.2f} ms load, {throughput:.0f} scores/s")
+        print(f"Errors for first owner: {errors[0].tolist()}")
+
+# Debug Quantized Models
+def debug_quantized_model(test_data, n_models=100):
+    """
+    Compare float16 and int8 exports of the trained autoencoder against float32.
+
+    Reports reconstruction-error deviation, disk size, and the average load time
+    and process RSS/PSS growth per model over `n_models` loads, after loading and
+    after one `predict` (which reads the memory-mapped pages in). Loading many
+    models keeps page rounding from hiding the per-model cost. Requires the model
+    saved by `debug_autoencoder`. Exports are written to a temporary directory.
+
+    :param test_data: Test user's normalized typing data.
+    :param n_models: Number of copies of each format to load.
+    """
+    print("\n=== Quantized Model Debug ===")
+    memory_before = _process_memory()
+    start = time.perf_counter()
+    models = [load_autoencoder() for _ in range(n_models)]
+    load_time = (time.perf_counter() - start) / n_models
+    memory_loaded = _process_memory()
+    for model in models:
+        reference = autoencoder_reconstruction_error(test_data, model)
+    memory_used = _process_memory()
+    print(f"float32: {os.path.getsize(MODEL_PATH) / 1024:.1f} KB on disk, {load_time * 1000:.2f} ms load, "
+          f"{_memory_delta(memory_before, memory_loaded, n_models)} loaded, "
+          f"{_memory_delta(memory_before, memory_used, n_models)} after predict")
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        for dtype in ("float16", "int8"):
+            # One export per simulated owner so each load maps its own file
+            paths = [export_quantized_model(models[0], path=os.path.join(export_dir, f"{dtype}_{i}"), dtype=dtype)
+                     for i in range(n_models)]
+            disk = sum(os.path.getsize(os.path.join(paths[0], name)) for name in os.listdir(paths[0]))
+
+            memory_before = _process_memory()
+            start = time.perf_counter()
+            quantized = [load_quantized_model(path) for path in paths]
+            load_time = (time.perf_counter() - start) / n_models
+            memory_loaded = _process_memory()
+            for model in quantized:
+                errors = autoencoder_reconstruction_error(test_data, model)
+            memory_used = _process_memory()
+
+            deviation = np.abs(errors - reference)
+            print(f"{dtype}: {disk / 1024:.1f} KB on disk, {load_time * 1000:.2f} ms load, "
+                  f"{_memory_delta(memory_before, memory_loaded, n_models)} loaded, "
+                  f"{_memory_delta(memory_before, memory_used, n_models)} after predict, "
+                  f"error deviation max {deviation.max():.2e}, mean {deviation.mean():.2e}")
+            del quantized, model  # Release the memory maps before the directory is removed
+
 if __name__ == "__main__":
     # Load sample data
     owner_data, test_data = load_sample_data()
@@ -97,3 +280,9 @@ if __name__ == "__main__":
     # Debug evaluator
     debug_evaluator(owner_data, test_data)
 
+    # Debug shared encoder
+    debug_shared_encoder(owner_data, test_data)
+
+    # Debug quantized models
+    debug_quantized_model(test_data)
+
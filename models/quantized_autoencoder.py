@@ -0,0 +1,160 @@
+"""
+Quantized export and loading of the typing autoencoder.
+
+This module includes:
+1. Exporting a trained autoencoder's Dense weights as float16 or per-channel int8.
+2. Loading them memory-mapped so several processes share the same pages.
+3. A NumPy model whose `predict` dequantizes on the fly, so it can be passed
+   directly to `calculate_reconstruction_error`.
+"""
+
+from tensorflow.python.keras.layers import Dense
+import numpy as np
+import json
+import os
+import shutil
+import tempfile
+
+QUANTIZED_MODEL_DIR = "models/owner_typing_model_q"  # Directory to save the quantized model
+
+ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0.0),
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "linear": lambda x: x,
+}
+
+WEIGHTS_FILE = "weights.bin"  # All kernels, scales and biases of one model
+ALIGNMENT = 64  # Byte alignment of each array inside the weights file
+
+def _quantize_layers(model, dtype):
+    """
+    Quantize every Dense layer of a model, rejecting anything predict cannot run.
+
+    :param model: Trained autoencoder model.
+    :param dtype: Either "float16" or "int8".
+    :return: List of (arrays, activation) where arrays maps "kernel"/"scale"/"bias" to Numpy arrays.
+    """
+    layers = []
+    for layer in model.layers:
+        if not isinstance(layer, Dense):
+            if layer.get_weights():
+                raise ValueError(f"Cannot quantize layer {layer.name}: only Dense layers are supported")
+            continue
+        activation = layer.get_config()["activation"]
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Cannot quantize layer {layer.name}: unsupported activation {activation}")
+
+        kernel, bias = layer.get_weights()
+        if dtype == "float16":
+            arrays = {"kernel": kernel.astype(np.float16)}
+        else:
+            # Symmetric per-output-channel scales so each column uses the full int8 range
+            scale = np.max(np.abs(kernel), axis=0) / 127.0
+            scale[scale == 0] = 1.0
+            quantized = np.clip(np.round(kernel / scale), -127, 127).astype(np.int8)
+            arrays = {"kernel": quantized, "scale": scale.astype(np.float32)}
+        arrays["bias"] = bias.astype(np.float32)
+        layers.append((arrays, activation))
+    return layers
+
+def export_quantized_model(model, path=QUANTIZED_MODEL_DIR, dtype="int8"):
+    """
+    Export a trained autoencoder's Dense layers with quantized kernels.
+
+    Kernels are stored as float16, or as int8 with one float32 scale per output
+    channel. Biases stay float32. All arrays are packed into a single weights
+    file, memory-mapped once at load time, with their offsets in `model.json`.
+    The export is written next to `path` and swapped in, replacing any previous
+    export, so readers never see a half-written model.
+
+    :param model: Trained autoencoder model.
+    :param path: Directory to write the quantized model to.
+    :param dtype: Either "float16" or "int8".
+    :return: Path of the exported model directory.
+    """
+    if dtype not in ("float16", "int8"):
+        raise ValueError(f"dtype must be 'float16' or 'int8', but got {dtype}")
+    layers = _quantize_layers(model, dtype)
+
+    path = os.path.normpath(path)
+    parent = os.path.dirname(path) or "."
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}-", dir=parent)
+    os.chmod(staging, 0o755)  # mkdtemp is owner-only; other processes need to read the export
+
+    config = {"dtype": dtype, "layers": []}
+    with open(os.path.join(staging, WEIGHTS_FILE), "wb") as file:
+        for arrays, activation in layers:
+            entry = {"activation": activation}
+            for name, array in arrays.items():
+                file.write(b"\0" * (-file.tell() % ALIGNMENT))
+                entry[name] = {"offset": file.tell(), "shape": list(array.shape), "dtype": array.dtype.str}
+                file.write(np.ascontiguousarray(array).tobytes())
+            config["layers"].append(entry)
+    with open(os.path.join(staging, "model.json"), "w") as file:
+        json.dump(config, file, indent=4)
+
+    # Move any previous export aside, swap the new one in, then drop the old one
+    retired = None
+    if os.path.exists(path):
+        retired = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}-old-", dir=parent)
+        os.replace(path, os.path.join(retired, "model"))
+    os.replace(staging, path)
+    if retired is not None:
+        shutil.rmtree(retired, ignore_errors=True)
+
+    print(f"Quantized ({dtype}) model saved to {path}")
+    return path
+
+class QuantizedAutoencoder:
+    """
+    NumPy autoencoder backed by memory-mapped quantized weights.
+
+    Weights are dequantized per call and never kept as a float32 copy.
+    """
+
+    def __init__(self, dtype, layers):
+        self.dtype = dtype
+        self.layers = layers  # List of (kernel, scale or None, bias, activation)
+
+    def predict(self, data):
+        """
+        Reconstruct the input data.
+
+        :param data: Normalized typing data.
+        :return: Reconstructed data as a float32 Numpy array.
+        """
+        x = np.asarray(data, dtype=np.float32)
+        for kernel, scale, bias, activation in self.layers:
+            x = x @ kernel.astype(np.float32)
+            if scale is not None:
+                x = x * scale  # Scales are per output channel, so they apply after the matmul
+            x = ACTIVATIONS[activation](x + bias)
+        return x
+
+def load_quantized_model(path=QUANTIZED_MODEL_DIR):
+    """
+    Load a quantized autoencoder with memory-mapped weights.
+
+    :param path: Directory the quantized model was exported to.
+    :return: QuantizedAutoencoder usable with `calculate_reconstruction_error`.
+    """
+    config_path = os.path.join(path, "model.json")
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"No quantized model found at {path}")
+
+    with open(config_path, "r") as file:
+        config = json.load(file)
+
+    # One memory map per model; every array is a view into it
+    weights = np.memmap(os.path.join(path, WEIGHTS_FILE), dtype=np.uint8, mode="r")
+
+    def view(entry):
+        return np.ndarray(tuple(entry["shape"]), dtype=np.dtype(entry["dtype"]),
+                          buffer=weights, offset=entry["offset"])
+
+    layers = []
+    for layer in config["layers"]:
+        scale = view(layer["scale"]) if "scale" in layer else None
+        layers.append((view(layer["kernel"]), scale, view(layer["bias"]), layer["activation"]))
+    return QuantizedAutoencoder(config["dtype"], layers)
@@ -0,0 +1,226 @@
+"""
+Shared-encoder autoencoder for hosting many owners.
+
+Instead of one standalone Keras model per owner, this module uses:
+1. A single encoder trained on the whole population and then frozen.
+2. A tiny per-owner decoder head, stored as a few KB of NumPy weights.
+
+Scoring many owners is one shared encoder pass followed by a batched
+NumPy evaluation of all the loaded heads.
+"""
+
+from tensorflow.python.keras.models import Sequential, load_model
+from tensorflow.python.keras.layers import Dense
+from tensorflow.python.keras.callbacks import EarlyStopping
+import numpy as np
+import hashlib
+import os
+
+from autoencoder import build_autoencoder
+
+SHARED_ENCODER_PATH = "models/shared_encoder.h5"  # Path to save the shared encoder
+USER_HEADS_DIR = "models/user_heads"  # Directory holding one head file per owner
+CODE_DIM = 32  # Size of the shared encoder output
+
+def train_shared_encoder(population_data, save_model=True, path=SHARED_ENCODER_PATH):
+    """
+    Train the shared encoder on typing data pooled from all owners.
+
+    A full autoencoder is trained on the population and its encoder layers are
+    kept, frozen, as the shared encoder.
+
+    :param population_data: Normalized typing data from many owners. Must be a 2D Numpy array.
+    :param save_model: Whether to save the shared encoder to disk.
+    :param path: Path to save the shared encoder to.
+    :return: Frozen shared encoder model.
+    """
+    if not isinstance(population_data, np.ndarray):
+        population_data = np.array(population_data)
+    if len(population_data.shape) != 2:
+        raise ValueError(f"Data must be a 2D array, but got shape {population_data.shape}")
+
+    population_data = population_data.astype(np.float32)
+    autoencoder = build_autoencoder(population_data.shape[1])
+
+    early_stopping = EarlyStopping(monitor="loss", patience=5)
+    autoencoder.fit(population_data, population_data,
+                    epochs=50, batch_size=16, shuffle=True, callbacks=[early_stopping])
+
+    # Keep the encoder half (input -> 64 -> CODE_DIM) and freeze it
+    encoder = Sequential(autoencoder.layers[:2])
+    encoder.trainable = False
+    encoder.compile(optimizer="adam", loss="mse")
+
+    if save_model:
+        encoder.save(path)
+        print(f"Shared encoder saved to {path}")
+    return encoder
+
+def load_shared_encoder(path=SHARED_ENCODER_PATH):
+    """
+    Load the pre-trained shared encoder.
+
+    :param path: Path the shared encoder was saved to.
+    :return: Loaded shared encoder model.
+    """
+    if os.path.exists(path):
+        return load_model(path)
+    else:
+        raise FileNotFoundError(f"No saved shared encoder found at {path}")
+
+def encoder_fingerprint(encoder):
+    """
+    Identify a shared encoder by a hash of its weights.
+
+    Heads store this so they cannot be scored against a retrained encoder.
+
+    :param encoder: Shared encoder model.
+    :return: Hex digest of the encoder weights.
+    """
+    digest = hashlib.sha256()
+    for weight in encoder.get_weights():
+        digest.update(np.ascontiguousarray(weight, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+def build_user_head(output_dim):
+    """
+    Build a small per-owner decoder head on top of the shared encoder output.
+
+    :param output_dim: The number of features to reconstruct.
+    :return: Compiled head model.
+    """
+    model = Sequential([
+        Dense(64, activation="relu", input_dim=CODE_DIM),
+        Dense(output_dim, activation="sigmoid")
+    ])
+    model.compile(optimizer="adam", loss="mse")
+    return model
+
+def _head_path(owner_id, heads_dir):
+    return os.path.join(heads_dir, f"{owner_id}.npz")
+
+def train_user_head(owner_id, data, encoder, save_head=True, heads_dir=USER_HEADS_DIR):
+    """
+    Train an owner's decoder head against the frozen shared encoder.
+
+    :param owner_id: Identifier used to name the saved head file.
+    :param data: Owner's normalized typing data. Must be a 2D Numpy array.
+    :param encoder: Frozen shared encoder model.
+    :param save_head: Whether to save the head weights to disk.
+    :param heads_dir: Directory to save the head file to.
+    :return: Head weights as a list of Numpy arrays [W1, b1, W2, b2].
+    """
+    if not isinstance(data, np.ndarray):
+        data = np.array(data)
+    if len(data.shape) != 2:
+        raise ValueError(f"Data must be a 2D array, but got shape {data.shape}")
+
+    data = data.astype(np.float32)
+    codes = encoder.predict(data)
+    head = build_user_head(data.shape[1])
+
+    early_stopping = EarlyStopping(monitor="loss", patience=5)
+    head.fit(codes, data, epochs=50, batch_size=16, shuffle=True, callbacks=[early_stopping])
+
+    weights = [w.astype(np.float32) for w in head.get_weights()]
+    if save_head:
+        path = _head_path(owner_id, heads_dir)
+        os.makedirs(heads_dir, exist_ok=True)
+        np.savez(path, *weights, encoder_id=np.array(encoder_fingerprint(encoder)))
+        print(f"Head for {owner_id} saved to {path}")
+    return weights
+
+def load_user_head(owner_id, encoder_id, heads_dir=USER_HEADS_DIR):
+    """
+    Load an owner's decoder head weights.
+
+    :param owner_id: Identifier of the owner.
+    :param encoder_id: `encoder_fingerprint` of the shared encoder the head will be scored against.
+    :param heads_dir: Directory the head file was saved to.
+    :return: Head weights as a list of Numpy arrays [W1, b1, W2, b2].
+    """
+    path = _head_path(owner_id, heads_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No saved head found at {path}")
+    with np.load(path) as archive:
+        if "encoder_id" not in archive.files or str(archive["encoder_id"]) != encoder_id:
+            raise ValueError(f"Head at {path} was not trained against the loaded shared encoder")
+        return [archive[f"arr_{i}"] for i in range(4)]
+
+def stack_user_heads(heads):
+    """
+    Stack several owners' head weights so they can be evaluated in one batch.
+
+    :param heads: List of head weight lists, all with the same output size.
+    :return: Tuple of stacked arrays (W1, b1, W2, b2), each with a leading owner axis.
+    """
+    return tuple(np.stack([head[i] for head in heads]) for i in range(4))
+
+def calculate_shared_reconstruction_error(data, encoder, stacked_heads):
+    """
+    Calculate reconstruction error of the same typing data under many owners' heads.
+
+    :param data: Normalized typing data to evaluate.
+    :param encoder: Frozen shared encoder model.
+    :param stacked_heads: Output of `stack_user_heads`.
+    :return: Array of shape (n_owners, n_samples) with per-sample errors for each owner.
+    """
+    data = np.asarray(data, dtype=np.float32)
+    codes = encoder.predict(data)  # One shared encoder pass for every owner
+    w1, b1, w2, b2 = stacked_heads
+
+    hidden = np.maximum(np.einsum("nc,uch->unh", codes, w1) + b1[:, None, :], 0.0)
+    logits = np.einsum("unh,uhd->und", hidden, w2) + b2[:, None, :]
+    reconstructed = 1.0 / (1.0 + np.exp(-logits))
+    return np.mean(np.square(data[None, :, :] - reconstructed), axis=2)
+
+class SharedEncoderScorer:
+    """
+    Keeps the shared encoder and many owners' stacked heads in memory for repeated scoring.
+    """
+
+    def __init__(self, encoder, owner_ids, heads_dir=USER_HEADS_DIR):
+        encoder_id = encoder_fingerprint(encoder)  # Computed once, compared against every head
+        self.encoder = encoder
+        self.owner_ids = list(owner_ids)
+        self.stacked_heads = stack_user_heads(
+            [load_user_head(owner_id, encoder_id, heads_dir) for owner_id in self.owner_ids]
+        )
+
+    def reconstruction_error(self, data):
+        """
+        Calculate per-sample reconstruction error under every loaded owner's head.
+
+        :param data: Normalized typing data to evaluate.
+        :return: Array of shape (n_owners, n_samples).
+        """
+        return calculate_shared_reconstruction_error(data, self.encoder, self.stacked_heads)
+
+    def evaluate_anomaly(self, test_data, threshold=0.1):
+        """
+        Evaluate anomaly for every loaded owner.
+
+        :param test_data: Normalized typing data for authentication.
+        :param threshold: Error threshold for anomaly detection.
+        :return: Dictionary mapping owner id to its errors and anomaly flag.
+        """
+        errors = self.reconstruction_error(test_data)
+        return {
+            owner_id: {"errors": owner_errors.tolist(), "anomaly": bool((owner_errors > threshold).any())}
+            for owner_id, owner_errors in zip(self.owner_ids, errors)
+        }
+
+def evaluate_shared_anomaly(test_data, owner_ids, threshold=0.1):
+    """
+    Evaluate anomaly for several owners at once using the shared encoder.
+
+    Loads the encoder and heads on every call; keep a `SharedEncoderScorer`
+    around instead when scoring repeatedly.
+
+    :param test_data: Normalized typing data for authentication.
+    :param owner_ids: Owners whose heads should score the data.
+    :param threshold: Error threshold for anomaly detection.
+    :return: Dictionary mapping owner id to its errors and anomaly flag.
+    """
+    scorer = SharedEncoderScorer(load_shared_encoder(), owner_ids)
+    return scorer.evaluate_anomaly(test_data, threshold)